@@ -0,0 +1,167 @@
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+from chess.notation import move_to_uci, parse_epd
+from chess.search import Search
+
+# Depth cap for searches limited by time only
+MAX_DEPTH = 64
+
+_search = None
+
+
+def _init_worker(max_entries):
+    """
+    Every worker keeps one Search for its lifetime. Consecutive
+    positions are handed to the same worker in chunks, so positions
+    from the same game find the transposition table already warm.
+    """
+
+    global _search
+    _search = Search(max_entries)
+
+
+def _analyse(task):
+    index, line, depth, movetime = task
+    result = {'index': index}
+
+    try:
+        position, operations = parse_epd(line)
+    except ValueError as error:
+        result['error'] = str(error)
+        return json.dumps(result)
+
+    if 'id' in operations:
+        result['id'] = operations['id']
+
+    start = time.perf_counter()
+    found = _search.search(position, depth or MAX_DEPTH, time_limit=movetime)
+
+    result.update(
+        bestmove=move_to_uci(found.move) if found.move else None,
+        score=found.score,
+        depth=found.depth,
+        nodes=found.nodes,
+        time=round(time.perf_counter() - start, 4),
+    )
+
+    return json.dumps(result)
+
+
+def read_positions(path):
+    """
+    Yields:
+        int: Index of the position, counting only non-empty lines.
+        str: The EPD or FEN line.
+    """
+
+    with open(path) as file:
+        lines = (line.strip() for line in file)
+        positions = (line for line in lines if line and not line.startswith('#'))
+
+        yield from enumerate(positions)
+
+
+def completed_results(output_path):
+    """
+    Counts the results already written by an interrupted run. A
+    partially written last line is cut off, so it is analysed again.
+    """
+
+    if not os.path.exists(output_path):
+        return 0
+
+    count, end = 0, 0
+
+    with open(output_path, 'rb+') as file:
+        offset = 0
+
+        while chunk := file.read(1 << 20):
+            newlines = chunk.count(b'\n')
+
+            if newlines:
+                count += newlines
+                end = offset + chunk.rindex(b'\n') + 1
+
+            offset += len(chunk)
+
+        file.truncate(end)
+
+    return count
+
+
+def analyse(input_path, output_path, depth=None, movetime=None, processes=None,
+            resume=False, max_entries=1_000_000, chunksize=16):
+    """
+    Analyses every position of an EPD/FEN file in a process pool and
+    streams one JSON result per line to output_path, in input order.
+
+    Parameters:
+    depth (int): Fixed search depth per position.
+    movetime (float): Search time per position in seconds. With both
+        set, the search stops at whichever comes first.
+    resume (bool): Continue after the results already in output_path
+        instead of starting over.
+
+    Returns:
+    int: Number of positions analysed in this run.
+    """
+
+    if depth is None and movetime is None:
+        raise ValueError("Either a search depth or a time per position is required.")
+
+    done = completed_results(output_path) if resume else 0
+
+    tasks = ((index, line, depth, movetime)
+             for index, line in itertools.islice(read_positions(input_path), done, None))
+
+    analysed = 0
+    start = time.perf_counter()
+
+    with open(output_path, 'a' if resume else 'w') as output, \
+         mp.Pool(processes, initializer=_init_worker, initargs=(max_entries,)) as pool:
+        for result in pool.imap(_analyse, tasks, chunksize=chunksize):
+            output.write(result + '\n')
+            analysed += 1
+
+    elapsed = time.perf_counter() - start
+
+    rate = analysed / elapsed if elapsed else 0.0
+    print(f"analysed {analysed} positions in {elapsed:.1f}s ({rate:.1f} positions/s)",
+          file=sys.stderr)
+
+    if done:
+        print(f"skipped {done} positions analysed by the previous run", file=sys.stderr)
+
+    return analysed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse every position of an EPD/FEN file.")
+    parser.add_argument('positions', help="EPD or FEN file, one position per line")
+    parser.add_argument('--output', required=True, help="JSONL file for the results")
+    parser.add_argument('--depth', type=int, default=None, help="search depth per position")
+    parser.add_argument('--movetime', type=float, default=None,
+                        help="search time per position in seconds; the depth 1 "
+                             "search always completes, so tiny budgets can overrun")
+    parser.add_argument('--processes', type=int, default=None, help="all cores by default")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue an interrupted run instead of starting over")
+    parser.add_argument('--chunksize', type=int, default=16,
+                        help="consecutive positions handed to a worker at once")
+    args = parser.parse_args()
+
+    if args.depth is None and args.movetime is None:
+        parser.error("one of --depth or --movetime is required")
+
+    analyse(args.positions, args.output, args.depth, args.movetime, args.processes,
+            args.resume, chunksize=args.chunksize)
+
+
+if __name__ == '__main__':
+    main()
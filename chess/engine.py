@@ -154,6 +154,116 @@ def gen_valid_moves(board, history, white_to_move, source_piece, source_pos, cas
             yield target_pos, True
 
 
+def update_castling_rights(castling_rights, source_pos, source_type, source_color):
+    """Revokes the castling rights lost by moving a king or rook."""
+
+    if source_type == 'K':
+        castling_rights[f'{source_color}_kingside'] = False
+        castling_rights[f'{source_color}_queenside'] = False
+
+    if source_type == 'R':
+        left_rook_pos, right_rook_pos, _, _ = _get_castle_pos(source_color)
+
+        if source_pos == right_rook_pos:
+            castling_rights[f'{source_color}_kingside'] = False
+        elif source_pos == left_rook_pos:
+            castling_rights[f'{source_color}_queenside'] = False
+
+
+def apply_move(board, source_pos, target_pos, special_move):
+    """
+    Moves a piece on the given board in place, including the
+    extra captures and rook hops of en passant and castling.
+    The move is assumed to have been validated beforehand.
+    """
+
+    source_row, source_col = source_pos
+    target_row, target_col = target_pos
+
+    source_name = piece_name(board, source_pos)
+
+    board[target_row][target_col] = board[source_row][source_col]
+    board[source_row][source_col] = EMPTY
+
+    if special_move == "en passant":
+        source_color = source_name[0]
+        if source_color == 'w':
+            en_passant_row = target_row + 1
+        else:
+            en_passant_row = target_row - 1
+
+        en_passant_col = target_col
+        board[en_passant_row][en_passant_col] = EMPTY
+
+    if special_move == "castle":
+        source_color = source_name[0]
+        left_rook, right_rook, queenside, kingside = _get_castle_pos(source_color)
+
+        if target_pos == queenside:
+            rook_row, rook_col = left_rook
+            king_row, king_col = source_pos
+
+            board[rook_row][rook_col+3] = board[rook_row][rook_col]
+            board[king_row][king_col-3] = board[king_row][king_col]
+            board[rook_row][rook_col] = EMPTY
+            board[king_row][king_col] = EMPTY
+        elif target_pos == kingside:
+            rook_row, rook_col = right_rook
+            king_row, king_col = source_pos
+
+            board[rook_row][rook_col-2] = board[rook_row][rook_col]
+            board[king_row][king_col+3] = board[king_row][king_col]
+            board[rook_row][rook_col] = EMPTY
+            board[king_row][king_col] = EMPTY
+
+
+def gen_all_moves(board, history, white_to_move, castling_rights):
+    """
+    Generates every valid move for the side to move. Unlike
+    gen_valid_moves, this covers all pieces at once and skips
+    squares that cannot be reached, which is what the search needs.
+
+    Yields:
+        source_pos: the position of the moving piece
+        target_pos: the position of the target square
+        str: the move type, e.g. "normal", "en passant" or "castle"
+    """
+
+    color = 'w' if white_to_move else 'b'
+
+    for source_row in range(BOARD_SIZE):
+        for source_col in range(BOARD_SIZE):
+            source_piece = board[source_row][source_col]
+
+            if source_piece[0] != color:
+                continue
+
+            source_pos = (source_row, source_col)
+
+            for row in range(BOARD_SIZE):
+                for col in range(BOARD_SIZE):
+                    target_piece = board[row][col]
+
+                    # Cannot attack friendly squares
+                    if target_piece[0] == color:
+                        continue
+
+                    target_pos = (row, col)
+                    move = [source_pos, target_pos]
+                    piece = _get_piece_object(move, source_piece, target_piece,
+                                              history, castling_rights)
+
+                    is_valid_piece, move_type = piece.validate()
+
+                    if not is_valid_piece:
+                        continue
+
+                    if not _is_path_clear(board, source_piece, source_pos, target_pos):
+                        continue
+
+                    yield source_pos, target_pos, move_type
+
+
 class Move:
     def __init__(self, board, history, white_to_move):
         """
@@ -225,17 +335,7 @@ class Move:
 
 
     def update_castle(self, source_pos, source_type, source_color):
-        if source_type == 'K':
-            self.castling_rights[f'{source_color}_kingside'] = False
-            self.castling_rights[f'{source_color}_queenside'] = False
-
-        if source_type == 'R':
-            left_rook_pos, right_rook_pos, _, _ = _get_castle_pos(source_color)
-
-            if source_pos == right_rook_pos:
-                self.castling_rights[f'{source_color}_kingside'] = False
-            elif source_pos == left_rook_pos:
-                self.castling_rights[f'{source_color}_queenside'] = False
+        update_castling_rights(self.castling_rights, source_pos, source_type, source_color)
 
 
     def log_turn(self):
@@ -267,45 +367,10 @@ class Engine:
         bool: True if the move was successfully made, False otherwise.
         """
 
-        source_row, source_col = source_pos
-        target_row, target_col = target_pos
-
         source_name = piece_name(self.board, source_pos)
         target_name = piece_name(self.board, target_pos)
 
-        self.board[target_row][target_col] = self.board[source_row][source_col]
-        self.board[source_row][source_col] = EMPTY
-
-        if special_move == "en passant":
-            source_color = source_name[0]
-            if source_color == 'w':
-                en_passant_row = target_row + 1
-            else:
-                en_passant_row = target_row - 1
-
-            en_passant_col = target_col
-            self.board[en_passant_row][en_passant_col] = EMPTY
-
-        if special_move == "castle":
-            source_color = source_name[0]
-            left_rook, right_rook, queenside, kingside = _get_castle_pos(source_color)
-
-            if target_pos == queenside:
-                rook_row, rook_col = left_rook
-                king_row, king_col = source_pos
-
-                self.board[rook_row][rook_col+3] = self.board[rook_row][rook_col]
-                self.board[king_row][king_col-3] = self.board[king_row][king_col]
-                self.board[rook_row][rook_col] = EMPTY
-                self.board[king_row][king_col] = EMPTY
-            elif target_pos == kingside:
-                rook_row, rook_col = right_rook
-                king_row, king_col = source_pos
-
-                self.board[rook_row][rook_col-2] = self.board[rook_row][rook_col]
-                self.board[king_row][king_col+3] = self.board[king_row][king_col]
-                self.board[rook_row][rook_col] = EMPTY
-                self.board[king_row][king_col] = EMPTY
+        apply_move(self.board, source_pos, target_pos, special_move)
 
         new_entry = ((source_pos, target_pos), (source_name, target_name), self.board)
         self.history.append(new_entry)
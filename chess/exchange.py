@@ -0,0 +1,280 @@
+from chess.pieces import PIECE_VALUES, King, Knight, Pawn
+from src.config import EMPTY, BOARD_SIZE
+
+SQUARES = [(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)]
+
+ORTHOGONAL = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+DIAGONAL = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+# Sliders that attack along each kind of ray
+ORTHOGONAL_SLIDERS = ('R', 'Q')
+DIAGONAL_SLIDERS = ('B', 'Q')
+
+
+def _leaper_table(Piece, source_piece, target_piece, **extra_info):
+    """
+    Precomputes the squares a non-sliding piece attacks from every
+    square, using the piece's own validation rules.
+    """
+
+    table = {}
+
+    for source_pos in SQUARES:
+        table[source_pos] = []
+
+        for target_pos in SQUARES:
+            if target_pos == source_pos:
+                continue
+
+            move = [source_pos, target_pos]
+            piece = Piece(move, source_piece, target_piece, **extra_info)
+            is_valid, move_type = piece.validate()
+
+            if is_valid and move_type == "normal":
+                table[source_pos].append(target_pos)
+
+    return table
+
+
+def _ray_table():
+    """Precomputes the squares along each direction from every square."""
+
+    table = {}
+
+    for source_pos in SQUARES:
+        for step in ORTHOGONAL + DIAGONAL:
+            row, col = source_pos
+            ray = []
+
+            while True:
+                row, col = row + step[0], col + step[1]
+
+                if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+                    break
+
+                ray.append((row, col))
+
+            table[source_pos, step] = ray
+
+    return table
+
+
+def _reverse(table):
+    """Turns 'attacks from' into 'attacked from'."""
+
+    reverse = {square: [] for square in SQUARES}
+
+    for source_pos, targets in table.items():
+        for target_pos in targets:
+            reverse[target_pos].append(source_pos)
+
+    return reverse
+
+
+_no_castling = {'w_kingside': False, 'w_queenside': False,
+                'b_kingside': False, 'b_queenside': False}
+
+KNIGHT_ATTACKS = _leaper_table(Knight, 'wN', 'bp')
+KING_ATTACKS = _leaper_table(King, 'wK', 'bp', castling_rights=_no_castling)
+
+# Squares from which a pawn of each color attacks a given square
+PAWN_ATTACKERS = {
+    'w': _reverse(_leaper_table(Pawn, 'wp', 'bp', history=None)),
+    'b': _reverse(_leaper_table(Pawn, 'bp', 'wp', history=None)),
+}
+
+RAYS = _ray_table()
+
+
+def _step_towards(source_pos, target_pos):
+    """Unit step from source to target, or None if they are not aligned."""
+
+    change_in_row = target_pos[0] - source_pos[0]
+    change_in_col = target_pos[1] - source_pos[1]
+
+    if change_in_row == 0 and change_in_col == 0:
+        return None
+
+    if change_in_row != 0 and change_in_col != 0 and abs(change_in_row) != abs(change_in_col):
+        return None
+
+    return (change_in_row // max(1, abs(change_in_row)),
+            change_in_col // max(1, abs(change_in_col)))
+
+
+def _slider_on_ray(board, square, step, removed):
+    """
+    Finds the first piece along a ray, looking through the squares
+    in removed. Returns its position if it is a slider that attacks
+    along this ray, else None.
+    """
+
+    sliders = ORTHOGONAL_SLIDERS if step in ORTHOGONAL else DIAGONAL_SLIDERS
+
+    for pos in RAYS[square, step]:
+        if pos in removed:
+            continue
+
+        piece = board[pos[0]][pos[1]]
+
+        if piece == EMPTY:
+            continue
+
+        return pos if piece[1] in sliders else None
+
+    return None
+
+
+def attackers(board, square, color, removed=()):
+    """
+    Finds the pieces of the given color attacking a square.
+
+    Parameters:
+    board (list): The current state of the chess board.
+    square (tuple): The attacked square (row, col).
+    color (str): 'w' or 'b'.
+    removed (set): Squares to treat as empty.
+
+    Returns:
+    list: Positions of the attacking pieces.
+    """
+
+    found = []
+
+    def add(pos):
+        piece = board[pos[0]][pos[1]]
+        if pos not in removed and piece[0] == color:
+            found.append(pos)
+
+    for pos in PAWN_ATTACKERS[color][square]:
+        if board[pos[0]][pos[1]][1] == 'p':
+            add(pos)
+
+    for pos in KNIGHT_ATTACKS[square]:
+        if board[pos[0]][pos[1]][1] == 'N':
+            add(pos)
+
+    for pos in KING_ATTACKS[square]:
+        if board[pos[0]][pos[1]][1] == 'K':
+            add(pos)
+
+    for step in ORTHOGONAL + DIAGONAL:
+        pos = _slider_on_ray(board, square, step, removed)
+        if pos is not None:
+            add(pos)
+
+    return found
+
+
+def see(position, move):
+    """
+    Static exchange evaluation. Plays out the sequence of captures on
+    the target square, each side always recapturing with its least
+    valuable attacker and stopping when that no longer pays. Sliders
+    behind a capturing piece join in as it leaves (x-rays). The board
+    itself is never modified.
+
+    Parameters:
+    position (Position): The position the move is played from.
+    move (tuple): The (source_pos, target_pos, move_type) to evaluate.
+
+    Returns:
+    int: The expected material balance of the exchange in centipawns,
+        from the moving side's point of view.
+    """
+
+    source_pos, target_pos, move_type = move
+    board = position.board
+
+    source_piece = board[source_pos[0]][source_pos[1]]
+    target_piece = board[target_pos[0]][target_pos[1]]
+
+    if move_type == "en passant":
+        captured_value = PIECE_VALUES['p']
+    elif target_piece == EMPTY or move_type == "castle":
+        captured_value = 0
+    else:
+        captured_value = PIECE_VALUES[target_piece[1]]
+
+    # Looking through the moving piece also finds the slider behind it
+    removed = {source_pos}
+    side = 'b' if source_piece[0] == 'w' else 'w'
+
+    candidates = {
+        'w': attackers(board, target_pos, 'w', removed),
+        'b': attackers(board, target_pos, 'b', removed),
+    }
+
+    gain = [captured_value]
+    on_square_value = PIECE_VALUES[source_piece[1]]
+
+    while candidates[side]:
+        attacker = min(candidates[side], key=lambda pos: PIECE_VALUES[board[pos[0]][pos[1]][1]])
+
+        gain.append(on_square_value - gain[-1])
+
+        candidates[side].remove(attacker)
+        removed.add(attacker)
+        on_square_value = PIECE_VALUES[board[attacker[0]][attacker[1]][1]]
+
+        step = _step_towards(target_pos, attacker)
+        if step is not None:
+            xray = _slider_on_ray(board, target_pos, step, removed)
+
+            if xray is not None:
+                candidates[board[xray[0]][xray[1]][0]].append(xray)
+
+        side = 'b' if side == 'w' else 'w'
+
+    # Each side may stand pat instead of recapturing
+    for depth in range(len(gain) - 1, 0, -1):
+        gain[depth - 1] = -max(-gain[depth - 1], gain[depth])
+
+    return gain[0]
+
+
+def capture_moves(position):
+    """
+    Generates the captures available to the side to move. En passant
+    is left out, as it never changes the material balance much.
+
+    Yields:
+        tuple: The (source_pos, target_pos, move_type) of each capture.
+    """
+
+    color = 'w' if position.white_to_move else 'b'
+    board = position.board
+
+    for target_pos in SQUARES:
+        target_piece = board[target_pos[0]][target_pos[1]]
+
+        if target_piece == EMPTY or target_piece[0] == color:
+            continue
+
+        for source_pos in attackers(board, target_pos, color):
+            yield source_pos, target_pos, "normal"
+
+
+def hanging_pieces(position, color):
+    """
+    Finds the pieces of the given color that the opponent can win
+    material against by capturing them.
+
+    Returns:
+    list: Positions of the hanging pieces.
+    """
+
+    enemy = 'b' if color == 'w' else 'w'
+    board = position.board
+    hanging = []
+
+    for target_pos in SQUARES:
+        if board[target_pos[0]][target_pos[1]][0] != color:
+            continue
+
+        for source_pos in attackers(board, target_pos, enemy):
+            if see(position, (source_pos, target_pos, "normal")) > 0:
+                hanging.append(target_pos)
+                break
+
+    return hanging
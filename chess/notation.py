@@ -0,0 +1,136 @@
+from chess.search import Position
+from src.config import BOARD_SIZE, EMPTY
+
+FILES = 'abcdefgh'
+
+_CASTLING_FLAGS = {'K': 'w_kingside', 'Q': 'w_queenside',
+                   'k': 'b_kingside', 'q': 'b_queenside'}
+
+
+def square_name(pos):
+    """
+    Converts a board index to its algebraic name.
+
+    Example:
+        square_name((7, 0)) -> 'a1'
+    """
+
+    row, col = pos
+
+    return f'{FILES[col]}{BOARD_SIZE - row}'
+
+
+def parse_square(name):
+    """Inverse of square_name."""
+
+    if len(name) != 2 or name[0] not in FILES or not name[1].isdigit():
+        raise ValueError(f"Invalid square: '{name}'.")
+
+    row = BOARD_SIZE - int(name[1])
+
+    if not 0 <= row < BOARD_SIZE:
+        raise ValueError(f"Invalid square: '{name}'.")
+
+    return row, FILES.index(name[0])
+
+
+def move_to_uci(move):
+    """Formats a move in coordinate notation, e.g. 'e2e4'."""
+
+    return square_name(move[0]) + square_name(move[1])
+
+
+def parse_fen(fen):
+    """
+    Builds a position from the first four fields of a FEN or EPD record
+    (placement, side to move, castling rights and en passant square).
+    The move counters, if present, are ignored.
+
+    Returns:
+    Position: The position described by the record.
+    """
+
+    fields = fen.split()
+
+    if len(fields) < 4:
+        raise ValueError(f"Incomplete FEN: '{fen}'.")
+
+    placement, side, castling, en_passant = fields[:4]
+    ranks = placement.split('/')
+
+    if len(ranks) != BOARD_SIZE:
+        raise ValueError(f"FEN must describe {BOARD_SIZE} ranks: '{fen}'.")
+
+    board = []
+
+    for rank in ranks:
+        row = []
+
+        for char in rank:
+            if char.isdigit():
+                row.extend([EMPTY] * int(char))
+            elif char.upper() in 'PNBRQK':
+                color = 'w' if char.isupper() else 'b'
+                piece_type = 'p' if char.upper() == 'P' else char.upper()
+                row.append(color + piece_type)
+            else:
+                raise ValueError(f"Invalid piece '{char}' in FEN: '{fen}'.")
+
+        if len(row) != BOARD_SIZE:
+            raise ValueError(f"Invalid rank '{rank}' in FEN: '{fen}'.")
+
+        board.append(row)
+
+    if side not in ('w', 'b'):
+        raise ValueError(f"Invalid side to move in FEN: '{fen}'.")
+
+    white_to_move = side == 'w'
+
+    castling_rights = {right: flag in castling for flag, right in _CASTLING_FLAGS.items()}
+
+    # En passant is validated from the last move, so recreate the double step
+    move, piece_names = (None, None), (None, None)
+
+    if en_passant != '-':
+        row, col = parse_square(en_passant)
+
+        if white_to_move:
+            move, piece_names = ((row - 1, col), (row + 1, col)), ('bp', EMPTY)
+        else:
+            move, piece_names = ((row + 1, col), (row - 1, col)), ('wp', EMPTY)
+
+    history = [(move, piece_names, board)]
+
+    return Position(board, history, white_to_move, castling_rights)
+
+
+def parse_epd(line):
+    """
+    Splits an EPD line into its position and operations.
+
+    Returns:
+    tuple: The Position, and a dict of operations, e.g. {'id': 'WAC.001'}.
+    """
+
+    fields = line.split(maxsplit=4)
+    position = parse_fen(' '.join(fields[:4]))
+
+    rest = fields[4] if len(fields) > 4 else ''
+
+    # Full FEN lines carry two move counters instead of operations
+    counters = rest.split(maxsplit=2)
+    if len(counters) >= 2 and counters[0].isdigit() and counters[1].isdigit():
+        rest = counters[2] if len(counters) > 2 else ''
+
+    operations = {}
+
+    for operation in rest.split(';'):
+        operation = operation.strip()
+
+        if not operation:
+            continue
+
+        opcode, _, operand = operation.partition(' ')
+        operations[opcode] = operand.strip().strip('"')
+
+    return position, operations
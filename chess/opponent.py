@@ -0,0 +1,190 @@
+import multiprocessing as mp
+import os
+import queue
+
+from chess.engine import gen_all_moves
+from chess.search import Search
+
+# Lower priority for the search process so the GUI keeps its frame rate
+WORKER_NICENESS = 5
+
+
+def _worker(commands, results, generation, max_entries, index=0, processes=1):
+    """
+    Runs searches in a separate process. A single Search instance is
+    kept for the lifetime of the worker, so its transposition table
+    carries over between moves and from pondering to thinking.
+
+    With several workers, the root moves are split between them: the
+    worker with the given index searches every processes-th move.
+    The moves are always generated in the same order, so a worker gets
+    the same share of a position when pondering and when thinking.
+    """
+
+    try:
+        os.nice(WORKER_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+    search = Search(max_entries)
+
+    while True:
+        command = commands.get()
+
+        if command is None:
+            break
+
+        request_id, position, max_depth, pondering = command
+
+        # A newer request has been issued in the meantime
+        def superseded():
+            return generation.value != request_id
+
+        if superseded():
+            continue
+
+        root_moves = None
+
+        if processes > 1:
+            moves = list(gen_all_moves(position.board, position.history,
+                                       position.white_to_move, position.castling_rights))
+            root_moves = moves[index::processes]
+
+        result = search.search(position, max_depth, should_stop=superseded,
+                               root_moves=root_moves)
+
+        # Pondering only warms up the transposition table
+        if not pondering and not superseded():
+            results.put((request_id, result))
+
+
+class EngineOpponent:
+    """
+    Engine opponent searching in a background process, so the
+    pygame loop is never blocked.
+
+    Every call to think, ponder or cancel supersedes the previous
+    request, and the workers abandon a search as soon as they notice.
+
+    The root moves are split between processes workers, one core being
+    left to the GUI by default. Every worker keeps its own transposition
+    table of max_entries // processes entries, and the best of their
+    moves is played.
+    """
+
+    def __init__(self, max_depth=3, max_entries=1_000_000, processes=None):
+        self.max_depth = max_depth
+        self.processes = processes or max(1, (os.cpu_count() or 1) - 1)
+
+        context = mp.get_context('spawn')
+
+        self._commands = [context.Queue() for _ in range(self.processes)]
+        self._results = context.Queue()
+        self._generation = context.Value('l', 0)
+        self._thinking = False
+        self._partial = []
+
+        self._workers = []
+
+        for index in range(self.processes):
+            worker = context.Process(target=_worker, daemon=True,
+                                     args=(self._commands[index], self._results,
+                                           self._generation, max_entries // self.processes,
+                                           index, self.processes))
+            worker.start()
+            self._workers.append(worker)
+
+
+    def think(self, position):
+        """Starts searching for a move to play in the given position."""
+
+        self._submit(position, pondering=False)
+        self._thinking = True
+        self._partial = []
+
+
+    def ponder(self, position):
+        """
+        Searches the position expected after the opponent's predicted
+        reply, until the next call to think or cancel.
+        """
+
+        self._submit(position, pondering=True)
+
+
+    def cancel(self):
+        """Stops the current search without starting a new one."""
+
+        with self._generation.get_lock():
+            self._generation.value += 1
+
+        self._thinking = False
+
+
+    def poll(self):
+        """
+        Checks for the result of the latest think request without blocking.
+
+        Returns:
+        SearchResult: The result of the search, or None if it is not ready.
+        """
+
+        if not self._thinking:
+            return None
+
+        while True:
+            try:
+                request_id, result = self._results.get_nowait()
+            except queue.Empty:
+                return None
+
+            # Results of superseded requests are dropped
+            if request_id != self._generation.value:
+                continue
+
+            self._partial.append(result)
+
+            if len(self._partial) == self.processes:
+                self._thinking = False
+                return _combine(self._partial)
+
+
+    def close(self):
+        """Shuts down the worker processes."""
+
+        self.cancel()
+
+        for commands in self._commands:
+            commands.put(None)
+
+        for worker in self._workers:
+            worker.join(timeout=1)
+
+            if worker.is_alive():
+                worker.terminate()
+
+
+    def _submit(self, position, pondering):
+        with self._generation.get_lock():
+            self._generation.value += 1
+            request_id = self._generation.value
+
+        for commands in self._commands:
+            commands.put((request_id, position, self.max_depth, pondering))
+
+
+def _combine(results):
+    """
+    Picks the best move of the workers' results, each covering a share
+    of the root moves, and adds up their node counts.
+    """
+
+    nodes = sum(result.nodes for result in results)
+    searched = [result for result in results if result.move is not None]
+
+    if not searched:
+        return results[0]._replace(nodes=nodes)
+
+    best = max(searched, key=lambda result: result.score)
+
+    return best._replace(nodes=nodes)
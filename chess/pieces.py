@@ -6,6 +6,17 @@ from src.config import EMPTY
 # TODO: King checks
 # TODO: Castling
 
+# Material values in centipawns. The king is worth more than all
+# other material combined, so losing it always decides the game.
+PIECE_VALUES = {
+    'p': 100,
+    'N': 320,
+    'B': 330,
+    'R': 500,
+    'Q': 900,
+    'K': 20000,
+}
+
 class Piece(ABC):
     def __init__(self, move, source_piece, target_piece, history=None, castling_rights=None):
         self.source_pos, self.target_pos = move
@@ -0,0 +1,392 @@
+import time
+from collections import namedtuple
+
+from chess.engine import CHESS_BOARD, apply_move, gen_all_moves, update_castling_rights
+from chess.exchange import capture_moves, see
+from chess.pieces import PIECE_VALUES
+from chess.utils import piece_name
+from src.config import EMPTY
+
+# Search positions only carry the latest history entry, since that
+# is all the piece validation looks at (for en passant).
+Position = namedtuple('Position', ['board', 'history', 'white_to_move', 'castling_rights'])
+
+SearchResult = namedtuple('SearchResult', ['move', 'score', 'depth', 'nodes', 'pv'])
+
+MATE_SCORE = PIECE_VALUES['K']
+INFINITY = 10 ** 9
+
+# Transposition table bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# How many nodes to search between checks of the stop condition. Under
+# a time limit the clock is read at every node instead, as a node with
+# its move generation costs far more than reading the clock.
+CHECK_INTERVAL = 256
+
+
+class SearchStopped(Exception):
+    """Raised inside the search once it has been asked to stop."""
+
+
+def start_position():
+    """Returns the initial position of a game."""
+
+    board = [row[:] for row in CHESS_BOARD]
+    move, piece_names = (None, None), (None, None)
+
+    castling_rights = {'w_kingside': True, 'w_queenside': True,
+                       'b_kingside': True, 'b_queenside': True}
+
+    return Position(board, [(move, piece_names, board)], True, castling_rights)
+
+
+def make_move(position, move):
+    """
+    Plays a move on a copy of the position.
+
+    Parameters:
+    position (Position): The position to play the move from.
+    move (tuple): The (source_pos, target_pos, move_type) to play.
+
+    Returns:
+    Position: The position after the move.
+    """
+
+    source_pos, target_pos, move_type = move
+
+    board = [row[:] for row in position.board]
+    source_name = piece_name(board, source_pos)
+    target_name = piece_name(board, target_pos)
+
+    apply_move(board, source_pos, target_pos, move_type)
+
+    castling_rights = dict(position.castling_rights)
+    update_castling_rights(castling_rights, source_pos, source_name[1], source_name[0])
+
+    history = [((source_pos, target_pos), (source_name, target_name), board)]
+
+    return Position(board, history, not position.white_to_move, castling_rights)
+
+
+def find_move(position, source_pos, target_pos):
+    """
+    Looks up a move given by its squares among the valid moves.
+
+    Returns:
+    tuple: The (source_pos, target_pos, move_type), or None if the
+        move is not valid in the position.
+    """
+
+    for move in gen_all_moves(position.board, position.history,
+                              position.white_to_move, position.castling_rights):
+        if move[0] == source_pos and move[1] == target_pos:
+            return move
+
+    return None
+
+
+def position_key(position):
+    """
+    Hashable key identifying a position in the transposition table.
+    The last move is only part of the key when it allows en passant.
+    """
+
+    (source_pos, target_pos), (source_name, _) = position.history[-1][:2]
+
+    en_passant = None
+    if source_name is not None and source_name[1] == 'p':
+        if abs(target_pos[0] - source_pos[0]) == 2:
+            en_passant = target_pos
+
+    squares = ''.join(''.join(row) for row in position.board)
+    rights = tuple(position.castling_rights.values())
+
+    return squares, position.white_to_move, rights, en_passant
+
+
+def evaluate(position):
+    """Material balance in centipawns from the side to move's view."""
+
+    score = 0
+
+    for row in position.board:
+        for piece in row:
+            if piece == EMPTY:
+                continue
+
+            value = PIECE_VALUES[piece[1]]
+            score += value if piece[0] == 'w' else -value
+
+    return score if position.white_to_move else -score
+
+
+def _has_king(position):
+    king = 'wK' if position.white_to_move else 'bK'
+
+    return any(king in row for row in position.board)
+
+
+def _is_capture(position, move):
+    _, target_pos, move_type = move
+
+    return move_type == "en passant" or piece_name(position.board, target_pos) != EMPTY
+
+
+class Search:
+    """
+    Iterative deepening alpha-beta search. The transposition table
+    lives on the instance, so it is kept between searches and a
+    search on a position that was pondered on starts out warm.
+    """
+
+    def __init__(self, max_entries=1_000_000):
+        self.transposition_table = {}
+        self.max_entries = max_entries
+
+        self.nodes = 0
+        self._should_stop = None
+        self._check_interval = CHECK_INTERVAL
+        self._root_moves = None
+        self._root_best = None
+
+
+    def search(self, position, max_depth, should_stop=None, time_limit=None, root_moves=None):
+        """
+        Searches the position up to max_depth plies.
+
+        Parameters:
+        position (Position): The position to search.
+        max_depth (int): The deepest iteration to run.
+        should_stop (callable): Polled during the search. Once it
+            returns True, the search stops and the result of the
+            last completed iteration is returned.
+        time_limit (float): Seconds after which the search stops the
+            same way. Iterations that complete are always kept. The
+            first iteration always completes, so that there is a move.
+        root_moves (list): Only search these moves at the root, e.g.
+            one worker's share of them. The result is then the best of
+            these moves only, with a score of -INFINITY if none of
+            them is valid.
+
+        Returns:
+        SearchResult: The best move found and its principal variation.
+        """
+
+        self.nodes = 0
+        self._should_stop = should_stop
+        self._check_interval = CHECK_INTERVAL
+        self._root_moves = root_moves
+
+        out_of_time = None
+
+        if time_limit is not None:
+            deadline = time.perf_counter() + time_limit
+
+            def out_of_time():
+                return time.perf_counter() >= deadline or bool(should_stop and should_stop())
+
+            self._check_interval = 1
+
+        result = SearchResult(None, 0, 0, 0, [])
+
+        for depth in range(1, max_depth + 1):
+            if depth == 2 and out_of_time is not None:
+                self._should_stop = out_of_time
+
+            # The root can return before picking a move, e.g. without a king
+            self._root_best = None
+
+            try:
+                score = self._negamax(position, depth, -INFINITY, INFINITY, 0)
+            except SearchStopped:
+                break
+
+            if root_moves is None:
+                pv = self.principal_variation(position, depth)
+            elif self._root_best is not None:
+                child = make_move(position, self._root_best)
+                pv = [self._root_best] + self.principal_variation(child, depth - 1)
+            else:
+                pv = []
+
+            move = pv[0] if pv else None
+
+            result = SearchResult(move, score, depth, self.nodes, pv)
+
+        return result._replace(nodes=self.nodes)
+
+
+    def principal_variation(self, position, length):
+        """Follows the best moves stored in the transposition table."""
+
+        pv = []
+        seen = set()
+
+        while len(pv) < length:
+            key = position_key(position)
+            entry = self.transposition_table.get(key)
+
+            if entry is None or entry[3] is None or key in seen:
+                break
+
+            seen.add(key)
+            move = entry[3]
+
+            pv.append(move)
+            position = make_move(position, move)
+
+        return pv
+
+
+    def order_moves(self, position, moves, tt_move=None):
+        """
+        Puts the transposition table move first, then winning and even
+        captures by static exchange, then quiet moves, then captures
+        that lose material.
+        """
+
+        def order(move):
+            if not _is_capture(position, move):
+                return 0
+
+            gain = see(position, move)
+
+            return gain + 1 if gain >= 0 else gain - MATE_SCORE
+
+        moves.sort(key=order, reverse=True)
+
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        return moves
+
+
+    def _negamax(self, position, depth, alpha, beta, ply):
+        self.nodes += 1
+
+        if self._should_stop and self.nodes % self._check_interval == 0 and self._should_stop():
+            raise SearchStopped
+
+        # Without a king check, a lost king is how the game ends
+        if not _has_king(position):
+            return -MATE_SCORE + ply
+
+        key = position_key(position)
+        entry = self.transposition_table.get(key)
+        tt_move = None
+
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, tt_move = entry
+
+            if ply > 0 and entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_score
+                if entry_flag == LOWER and entry_score >= beta:
+                    return entry_score
+                if entry_flag == UPPER and entry_score <= alpha:
+                    return entry_score
+
+        if depth == 0:
+            return self._quiescence(position, alpha, beta, ply)
+
+        moves = list(gen_all_moves(position.board, position.history,
+                                   position.white_to_move, position.castling_rights))
+
+        if not moves:
+            return 0
+
+        if ply == 0 and self._root_moves is not None:
+            moves = [move for move in moves if move in self._root_moves]
+
+            if not moves:
+                return -INFINITY
+
+        moves = self.order_moves(position, moves, tt_move)
+
+        original_alpha = alpha
+        best_score, best_move = -INFINITY, None
+
+        for move in moves:
+            child = make_move(position, move)
+            score = -self._negamax(child, depth - 1, -beta, -alpha, ply + 1)
+
+            if score > best_score:
+                best_score, best_move = score, move
+
+            alpha = max(alpha, score)
+
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+
+        # A score over only some root moves must not be reused for the
+        # position when it is reached by a full search
+        if ply == 0 and self._root_moves is not None:
+            self._root_best = best_move
+        else:
+            self._store(key, depth, best_score, flag, best_move)
+
+        return best_score
+
+
+    def _quiescence(self, position, alpha, beta, ply):
+        """
+        Resolves captures until the position is quiet. Captures that
+        lose material by static exchange are pruned, which keeps the
+        search from exploding in capture-heavy positions.
+        """
+
+        self.nodes += 1
+
+        if self._should_stop and self.nodes % self._check_interval == 0 and self._should_stop():
+            raise SearchStopped
+
+        if not _has_king(position):
+            return -MATE_SCORE + ply
+
+        best_score = evaluate(position)
+
+        if best_score >= beta:
+            return best_score
+
+        alpha = max(alpha, best_score)
+
+        captures = []
+        for move in capture_moves(position):
+            gain = see(position, move)
+
+            if gain >= 0:
+                captures.append((gain, move))
+
+        captures.sort(key=lambda capture: capture[0], reverse=True)
+
+        for _, move in captures:
+            score = -self._quiescence(make_move(position, move), -beta, -alpha, ply + 1)
+
+            if score > best_score:
+                best_score = score
+
+            if score >= beta:
+                break
+
+            alpha = max(alpha, score)
+
+        return best_score
+
+
+    def _store(self, key, depth, score, flag, move):
+        table = self.transposition_table
+
+        # Keep memory bounded over a long game
+        if key not in table and len(table) >= self.max_entries:
+            table.clear()
+
+        table[key] = (depth, score, flag, move)
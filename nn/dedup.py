@@ -0,0 +1,445 @@
+import argparse
+import glob
+import math
+import os
+
+import numpy as np
+
+from nn.encoding import mix64, open_shard, position_hash, write_shard
+
+# One record per unique position. The source packs the shard number
+# and row of the first occurrence as shard << 32 | row.
+RECORD = np.dtype([
+    ('key', '<u8'),
+    ('source', '<u8'),
+    ('count', '<u8'),
+    ('wins', '<u8'),
+    ('draws', '<u8'),
+    ('losses', '<u8'),
+])
+
+STATS = ('count', 'wins', 'draws', 'losses')
+
+
+class BloomFilter:
+    """
+    Bit array answering "definitely not seen" or "maybe seen" for
+    64-bit keys, using double hashing for the k probe positions.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+
+        self.size = max(64, int(math.ceil(bits / 64)) * 64)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros(self.size // 8, dtype=np.uint8)
+
+
+    def add(self, keys):
+        probes = self._probes(keys).ravel()
+        np.bitwise_or.at(self.bits, probes >> 3, (1 << (probes & 7)).astype(np.uint8))
+
+
+    def contains(self, keys):
+        """Returns a boolean mask, False where a key was never added."""
+
+        probes = self._probes(keys)
+        found = (self.bits[probes >> 3] >> (probes & 7)) & 1
+
+        return found.all(axis=1)
+
+
+    def _probes(self, keys):
+        first = mix64(keys)
+        second = mix64(first) | np.uint64(1)
+        steps = np.arange(self.hashes, dtype=np.uint64)
+
+        probes = first[:, None] + steps * second[:, None]
+
+        return (probes % np.uint64(self.size)).astype(np.int64)
+
+
+def _aggregate(records):
+    """Sorts records by key and merges the ones with equal keys."""
+
+    if len(records) == 0:
+        return records
+
+    records = records[np.argsort(records['key'], kind='stable')]
+
+    keys = records['key']
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+    if len(starts) == len(records):
+        return records
+
+    merged = records[starts].copy()
+    merged['source'] = np.minimum.reduceat(records['source'], starts)
+
+    for field in STATS:
+        merged[field] = np.add.reduceat(records[field], starts)
+
+    return merged
+
+
+def _load(path, dtype=RECORD, mode='r'):
+    """Memory-maps a file of records; empty files give an empty array."""
+
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=dtype)
+
+    return np.memmap(path, dtype=dtype, mode=mode)
+
+
+def merge_runs(paths, output_path, keys_path=None, chunk_size=1 << 20):
+    """
+    Merges sorted record files into one, summing the statistics of
+    equal keys. Only chunk_size records per input are held in memory
+    at a time.
+
+    If keys_path is given, the merged keys are also written on their
+    own to it, as binary search needs them contiguous.
+    """
+
+    runs = [_load(path) for path in paths]
+    offsets = [0] * len(runs)
+    buffers = [run[:chunk_size] for run in runs]
+
+    keys_output = keys_path + '.tmp' if keys_path else os.devnull
+
+    with open(output_path + '.tmp', 'wb') as output, open(keys_output, 'wb') as keys:
+        while True:
+            active = [index for index, buffer in enumerate(buffers) if len(buffer)]
+
+            if not active:
+                break
+
+            # Every key up to the smallest buffered maximum is complete
+            bound = min(buffers[index]['key'][-1] for index in active)
+            parts = []
+
+            for index in active:
+                buffer = buffers[index]
+                end = np.searchsorted(buffer['key'], bound, side='right')
+
+                parts.append(np.asarray(buffer[:end]))
+
+                if end == len(buffer):
+                    offsets[index] += chunk_size
+                    buffers[index] = runs[index][offsets[index]:offsets[index] + chunk_size]
+                else:
+                    buffers[index] = buffer[end:]
+
+            merged = _aggregate(np.concatenate(parts))
+
+            output.write(merged.tobytes())
+            keys.write(np.ascontiguousarray(merged['key']).tobytes())
+
+    del runs, buffers
+    os.replace(output_path + '.tmp', output_path)
+
+    if keys_path:
+        os.replace(keys_path + '.tmp', keys_path)
+
+
+class DedupIndex:
+    """
+    Disk-backed index of unique positions with visit counts and
+    result statistics.
+
+    New keys are collected in memory and spilled to sorted run files.
+    Runs are merged in levels: once a level holds max_runs runs, they
+    are merged into one run on the next level. All runs are folded into
+    the main index only once together they are at least as large as
+    it, so the main index at least doubles with every rewrite.
+
+    Every record is therefore rewritten about log_max_runs(N / buffer_size)
+    times while climbing the levels, plus at most twice by main index
+    rewrites, for N unique positions. Total I/O is O(N log N), not
+    quadratic.
+
+    The main index is a sorted, memory-mapped file of records, with a
+    copy of its keys for binary search. A bloom filter in front of it
+    answers most lookups of new positions without touching the disk.
+    Positions still in runs are not looked up; their duplicates are
+    summed up when the runs are merged.
+    """
+
+    def __init__(self, directory, capacity, error_rate=0.01,
+                 buffer_size=1 << 22, max_runs=8):
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.max_runs = max_runs
+
+        self.bloom = BloomFilter(capacity, error_rate)
+
+        self._buffer = []
+        self._buffered = 0
+        self._levels = [[]]
+        self._run_counter = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, 'index.bin')
+        self.keys_path = os.path.join(directory, 'keys.bin')
+
+        for path in (self.index_path, self.keys_path):
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+
+        self._open()
+
+        # Reopening an existing index refills the bloom filter
+        for start in range(0, len(self._keys), buffer_size):
+            self.bloom.add(np.asarray(self._keys[start:start + buffer_size]))
+
+
+    def __len__(self):
+        return len(self._index)
+
+
+    def add(self, keys, sources, values):
+        """
+        Counts a batch of positions.
+
+        Parameters:
+        keys (np.ndarray): Position hashes, uint64.
+        sources (np.ndarray): shard << 32 | row of every position, uint64.
+        values (np.ndarray): Game results from white's point of view.
+        """
+
+        records = np.zeros(len(keys), dtype=RECORD)
+        records['key'] = keys
+        records['source'] = sources
+        records['count'] = 1
+        records['wins'] = values > 0
+        records['draws'] = values == 0
+        records['losses'] = values < 0
+
+        records = _aggregate(records)
+        positions, found = self._find(records['key'])
+
+        # Keys are unique after aggregating, so this is a plain update
+        for field in STATS:
+            self._index[field][positions[found]] += records[field][found]
+
+        self._append(records[~found])
+
+
+    def lookup(self, keys):
+        """
+        Finds the statistics of the given positions in the main index.
+
+        Returns:
+        np.ndarray: Records in the order of keys, with a count of 0
+            for positions that are not in the index.
+        """
+
+        keys = np.asarray(keys, dtype=np.uint64)
+        records = np.zeros(len(keys), dtype=RECORD)
+        records['key'] = keys
+
+        positions, found = self._find(keys)
+        records[found] = self._index[positions[found]]
+
+        return records
+
+
+    def flush(self):
+        """Writes buffered positions to a new sorted run."""
+
+        if not self._buffer:
+            return
+
+        run = _aggregate(np.concatenate(self._buffer))
+        path = self._run_path()
+
+        run.tofile(path)
+        self._levels[0].append(path)
+
+        self._buffer = []
+        self._buffered = 0
+
+        self._compact()
+
+
+    def merge(self):
+        """Merges all runs into the main index."""
+
+        self.flush()
+
+        runs = [path for level in self._levels for path in level]
+
+        if not runs:
+            return
+
+        if isinstance(self._index, np.memmap):
+            self._index.flush()
+
+        self._index = self._keys = None
+        merge_runs([self.index_path] + runs, self.index_path, self.keys_path)
+
+        for path in runs:
+            os.remove(path)
+
+        self._levels = [[]]
+        self._open()
+
+
+    def _compact(self):
+        """Merges full levels upwards, then into the main index once due."""
+
+        for level, runs in enumerate(self._levels):
+            if len(runs) < self.max_runs:
+                continue
+
+            if level + 1 == len(self._levels):
+                self._levels.append([])
+
+            path = self._run_path()
+            merge_runs(runs, path)
+
+            for run in runs:
+                os.remove(run)
+
+            self._levels[level] = []
+            self._levels[level + 1].append(path)
+
+        run_bytes = sum(os.path.getsize(path) for level in self._levels for path in level)
+
+        if run_bytes >= os.path.getsize(self.index_path):
+            self.merge()
+
+
+    def _run_path(self):
+        self._run_counter += 1
+
+        return os.path.join(self.directory, f'run-{self._run_counter:06d}.bin')
+
+
+    def _open(self):
+        self._index = _load(self.index_path, mode='r+')
+        self._keys = _load(self.keys_path, dtype=np.uint64)
+
+
+    def _find(self, keys):
+        """
+        Locates keys in the main index. Only keys the bloom filter may
+        have seen are searched for on disk.
+
+        Returns:
+        tuple: Index positions and a mask of the keys that were found.
+        """
+
+        positions = np.zeros(len(keys), dtype=np.int64)
+        found = np.zeros(len(keys), dtype=bool)
+
+        candidates = np.flatnonzero(self.bloom.contains(keys))
+
+        if len(candidates) and len(self._keys):
+            candidate_positions = np.searchsorted(self._keys, keys[candidates])
+            candidate_positions = np.minimum(candidate_positions, len(self._keys) - 1)
+
+            positions[candidates] = candidate_positions
+            found[candidates] = self._keys[candidate_positions] == keys[candidates]
+
+        return positions, found
+
+
+    def _append(self, records):
+        if len(records) == 0:
+            return
+
+        self.bloom.add(records['key'])
+        self._buffer.append(records)
+        self._buffered += len(records)
+
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+
+def build_index(index, shard_paths, batch_size=1 << 16):
+    """Feeds every position of the given shards into the index."""
+
+    for shard_number, path in enumerate(shard_paths):
+        shard = open_shard(path)
+
+        for start in range(0, len(shard['moves']), batch_size):
+            planes = shard['planes'][start:start + batch_size]
+            rows = np.arange(start, start + len(planes), dtype=np.uint64)
+
+            sources = (np.uint64(shard_number) << np.uint64(32)) | rows
+            index.add(position_hash(planes), sources, shard['values'][start:start + batch_size])
+
+    index.merge()
+
+
+def write_unique_shards(index, shard_paths, output_dir, shard_size=1 << 17):
+    """
+    Writes one sample per unique position, taken from its first
+    occurrence. The value is the mean result over all occurrences and
+    the visit counts are stored next to it in counts.npy. Shards come
+    out in key order, which is effectively shuffled.
+
+    Returns:
+    list: Paths of the written shards.
+    """
+
+    shards = [open_shard(path) for path in shard_paths]
+    records = _load(index.index_path)
+    written = []
+
+    for start in range(0, len(records), shard_size):
+        chunk = np.asarray(records[start:start + shard_size])
+
+        # Reading shard by shard, row by row keeps the reads sequential
+        order = np.argsort(chunk['source'])
+        chunk = chunk[order]
+
+        shard_numbers = (chunk['source'] >> np.uint64(32)).astype(np.int64)
+        rows = (chunk['source'] & np.uint64(0xffffffff)).astype(np.int64)
+
+        planes = np.empty((len(chunk),) + shards[0]['planes'].shape[1:], dtype=np.uint8)
+        moves = np.empty(len(chunk), dtype=np.int32)
+
+        for shard_number in np.unique(shard_numbers):
+            selected = np.flatnonzero(shard_numbers == shard_number)
+            shard = shards[shard_number]
+
+            planes[selected] = shard['planes'][rows[selected]]
+            moves[selected] = shard['moves'][rows[selected]]
+
+        counts = chunk['count'].astype(np.float64)
+        values = (chunk['wins'].astype(np.float64) - chunk['losses']) / counts
+
+        path = os.path.join(output_dir, f'shard-{len(written):05d}')
+        write_shard(path, planes, moves, values)
+        np.save(os.path.join(path, 'counts.npy'), chunk['count'].astype(np.uint32))
+
+        written.append(path)
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate encoded position shards.")
+    parser.add_argument('shards', nargs='+', help="shard directories or glob patterns")
+    parser.add_argument('--output', required=True, help="directory for the unique shards")
+    parser.add_argument('--work-dir', required=True, help="directory for the on-disk index")
+    parser.add_argument('--capacity', type=int, default=10 ** 8,
+                        help="expected number of unique positions, sizes the bloom filter")
+    parser.add_argument('--buffer-size', type=int, default=1 << 22,
+                        help="positions held in memory before spilling a run")
+    parser.add_argument('--shard-size', type=int, default=1 << 17)
+    args = parser.parse_args()
+
+    shard_paths = sorted(path for pattern in args.shards for path in glob.glob(pattern))
+
+    index = DedupIndex(args.work_dir, args.capacity, buffer_size=args.buffer_size)
+    build_index(index, shard_paths)
+
+    written = write_unique_shards(index, shard_paths, args.output, args.shard_size)
+    print(f"{len(index)} unique positions written to {len(written)} shards")
+
+
+if __name__ == '__main__':
+    main()
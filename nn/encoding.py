@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+
+from src.config import BOARD_SIZE, EMPTY
+
+# One plane per piece type and color, white first
+PIECE_PLANES = ['wp', 'wN', 'wB', 'wR', 'wQ', 'wK',
+                'bp', 'bN', 'bB', 'bR', 'bQ', 'bK']
+
+CASTLING_PLANES = ['w_kingside', 'w_queenside', 'b_kingside', 'b_queenside']
+
+SIDE_PLANE = len(PIECE_PLANES)          # All ones if white is to move
+CASTLING_PLANE = SIDE_PLANE + 1         # First of the four castling planes
+NUM_PLANES = CASTLING_PLANE + len(CASTLING_PLANES)
+
+NUM_SQUARES = BOARD_SIZE * BOARD_SIZE
+NUM_MOVES = NUM_SQUARES * NUM_SQUARES   # Every (source, target) pair
+
+_PLANE_INDEX = {piece: index for index, piece in enumerate(PIECE_PLANES)}
+
+# Distinguishes equal words at different offsets when hashing
+_WORD_SEEDS = np.random.default_rng(0x5EED).integers(
+    0, 2 ** 64, size=NUM_PLANES * NUM_SQUARES // 64, dtype=np.uint64)
+
+
+def encode_position(position):
+    """
+    Encodes a position as a stack of binary planes.
+
+    Returns:
+    np.ndarray: uint8 array of shape (NUM_PLANES, 8, 8).
+    """
+
+    planes = np.zeros((NUM_PLANES, BOARD_SIZE, BOARD_SIZE), dtype=np.uint8)
+
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            piece = position.board[row][col]
+
+            if piece != EMPTY:
+                planes[_PLANE_INDEX[piece], row, col] = 1
+
+    if position.white_to_move:
+        planes[SIDE_PLANE] = 1
+
+    for index, right in enumerate(CASTLING_PLANES):
+        if position.castling_rights[right]:
+            planes[CASTLING_PLANE + index] = 1
+
+    return planes
+
+
+def position_hash(planes):
+    """
+    64-bit hash of encoded positions, for deduplication.
+
+    Parameters:
+    planes (np.ndarray): uint8 array of shape (N, NUM_PLANES, 8, 8).
+
+    Returns:
+    np.ndarray: uint64 array of shape (N,).
+    """
+
+    # 1088 bits pack into exactly 17 words per position
+    packed = np.packbits(planes.reshape(len(planes), -1).astype(bool), axis=1)
+    words = np.ascontiguousarray(packed).view('<u8')
+
+    mixed = mix64(words ^ _WORD_SEEDS)
+
+    return mix64(np.bitwise_xor.reduce(mixed, axis=1))
+
+
+def mix64(keys):
+    """Finalizer of splitmix64, spreading every input bit over the output."""
+
+    keys = np.asarray(keys, dtype=np.uint64)
+
+    keys = (keys ^ (keys >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    keys = (keys ^ (keys >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+
+    return keys ^ (keys >> np.uint64(31))
+
+
+def encode_move(move):
+    """Maps a move to its policy index, source square * 64 + target square."""
+
+    (source_row, source_col), (target_row, target_col) = move[:2]
+
+    source = source_row * BOARD_SIZE + source_col
+    target = target_row * BOARD_SIZE + target_col
+
+    return source * NUM_SQUARES + target
+
+
+def decode_move(index):
+    """Inverse of encode_move, returning (source_pos, target_pos)."""
+
+    source, target = divmod(int(index), NUM_SQUARES)
+
+    return divmod(source, BOARD_SIZE), divmod(target, BOARD_SIZE)
+
+
+def write_shard(path, planes, moves, values):
+    """
+    Writes an encoded shard as a directory of .npy files, so that it
+    can be memory-mapped when reading.
+
+    Parameters:
+    path (str): Directory of the shard.
+    planes (np.ndarray): uint8 array of shape (N, NUM_PLANES, 8, 8).
+    moves (np.ndarray): Policy index of the move played, shape (N,).
+    values (np.ndarray): Game result from white's point of view, shape (N,).
+    """
+
+    os.makedirs(path, exist_ok=True)
+
+    np.save(os.path.join(path, 'planes.npy'), np.asarray(planes, dtype=np.uint8))
+    np.save(os.path.join(path, 'moves.npy'), np.asarray(moves, dtype=np.int32))
+    np.save(os.path.join(path, 'values.npy'), np.asarray(values, dtype=np.float32))
+
+
+def open_shard(path):
+    """
+    Memory-maps a shard written by write_shard.
+
+    Returns:
+    dict: Read-only arrays under 'planes', 'moves' and 'values'.
+    """
+
+    return {
+        name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        for name in ('planes', 'moves', 'values')
+    }
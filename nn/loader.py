@@ -0,0 +1,266 @@
+import queue
+import threading
+
+import numpy as np
+
+from nn.encoding import (
+    CASTLING_PLANE,
+    CASTLING_PLANES,
+    NUM_MOVES,
+    NUM_PLANES,
+    NUM_SQUARES,
+    PIECE_PLANES,
+    SIDE_PLANE,
+    open_shard,
+)
+from src.config import BOARD_SIZE
+
+
+def _square_permutation(mirror, flip):
+    """Gather indices mapping every square to its mirrored/flipped square."""
+
+    rows, cols = np.divmod(np.arange(NUM_SQUARES), BOARD_SIZE)
+
+    if mirror:
+        cols = BOARD_SIZE - 1 - cols
+    if flip:
+        rows = BOARD_SIZE - 1 - rows
+
+    return rows * BOARD_SIZE + cols
+
+
+def _channel_permutation(flip):
+    """Swaps the white and black planes when flipping colors."""
+
+    channels = np.arange(NUM_PLANES)
+
+    if flip:
+        half = len(PIECE_PLANES) // 2
+        channels[:half], channels[half:2 * half] = channels[half:2 * half].copy(), channels[:half].copy()
+
+        castling = CASTLING_PLANE + np.arange(len(CASTLING_PLANES))
+        channels[castling] = np.roll(castling, 2)
+
+    return channels
+
+
+# Indexed by transform = 2 * flip + mirror. All transforms are their
+# own inverse, so the same tables map squares in either direction.
+SQUARE_PERMUTATIONS = np.stack([_square_permutation(mirror, flip)
+                                for flip in (False, True) for mirror in (False, True)])
+
+CHANNEL_PERMUTATIONS = np.stack([_channel_permutation(flip) for flip in (False, True)])
+
+_sources, _targets = np.divmod(np.arange(NUM_MOVES), NUM_SQUARES)
+MOVE_PERMUTATIONS = SQUARE_PERMUTATIONS[:, _sources] * NUM_SQUARES + SQUARE_PERMUTATIONS[:, _targets]
+
+
+def augment(planes, moves, values, rng):
+    """
+    Applies a random symmetry to every position in a minibatch.
+
+    Colors are flipped (ranks reversed, white and black swapped, result
+    negated) with probability 1/2. Positions without castling rights
+    are also mirrored left to right with probability 1/2, since with
+    castling the two sides of the board are not equivalent.
+
+    Parameters:
+    planes (np.ndarray): uint8 array of shape (N, NUM_PLANES, 8, 8).
+    moves (np.ndarray): Policy indices, shape (N,).
+    values (np.ndarray): Game results from white's point of view, shape (N,).
+    rng (np.random.Generator): Source of randomness.
+
+    Returns:
+    tuple: New (planes, moves, values) arrays.
+    """
+
+    size = len(planes)
+
+    can_mirror = ~planes[:, CASTLING_PLANE:].any(axis=(1, 2, 3))
+    mirror = can_mirror & (rng.random(size) < 0.5)
+    flip = rng.random(size) < 0.5
+
+    transform = 2 * flip + mirror
+
+    squares = SQUARE_PERMUTATIONS[transform][:, None, :]
+    channels = CHANNEL_PERMUTATIONS[flip.astype(np.intp)][:, :, None]
+    rows = np.arange(size)[:, None, None]
+
+    flat = planes.reshape(size, NUM_PLANES, NUM_SQUARES)
+    augmented = flat[rows, channels, squares].reshape(planes.shape)
+
+    # The side to move changes with the colors
+    augmented[flip, SIDE_PLANE] ^= 1
+
+    moves = MOVE_PERMUTATIONS[transform, moves]
+    values = np.where(flip, -values, values)
+
+    return augmented, moves, values
+
+
+class BatchLoader:
+    """
+    Streams shuffled minibatches from memory-mapped shards.
+
+    Batches are read and augmented by background threads into a
+    bounded queue, so the next batches are ready while the trainer
+    works on the current one. NumPy releases the GIL for the copies
+    and gathers, so the threads do run in parallel with training.
+
+    The epoch is planned lazily, shard_group shards at a time: the
+    shards are visited in random order, and the batches of a group are
+    shuffled among each other. Memory for the plan is bounded by the
+    rows of one group, not the whole dataset.
+    """
+
+    def __init__(self, shard_paths, batch_size=256, augment=True, shuffle=True,
+                 workers=2, prefetch=2, seed=None, shard_group=4):
+        self.shards = [open_shard(path) for path in shard_paths]
+        self.batch_size = batch_size
+        self.augment = augment
+        self.shuffle = shuffle
+        self.workers = workers
+        self.prefetch = prefetch
+        self.shard_group = shard_group
+
+        self._seed_sequence = np.random.SeedSequence(seed)
+
+
+    def __len__(self):
+        return sum(-(-len(shard['moves']) // self.batch_size) for shard in self.shards)
+
+
+    def __iter__(self):
+        """
+        Yields one epoch of (planes, moves, values) minibatches. Each
+        batch comes from a single shard to keep reads local.
+        """
+
+        epoch_seed, *worker_seeds = self._seed_sequence.spawn(self.workers + 1)
+        rng = np.random.default_rng(epoch_seed)
+
+        tasks = queue.Queue(maxsize=self.workers * self.prefetch)
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        feeder = threading.Thread(target=self._feed, daemon=True,
+                                  args=(self._plan(rng), tasks, stop))
+
+        threads = [
+            threading.Thread(target=self._worker, daemon=True,
+                             args=(tasks, batches, stop, np.random.default_rng(seed)))
+            for seed in worker_seeds
+        ]
+
+        feeder.start()
+
+        for thread in threads:
+            thread.start()
+
+        finished = 0
+
+        try:
+            while finished < len(threads):
+                batch = batches.get()
+
+                if batch is None:
+                    finished += 1
+                    continue
+
+                if isinstance(batch, BaseException):
+                    raise batch
+
+                yield batch
+        finally:
+            stop.set()
+
+            for thread in threads + [feeder]:
+                thread.join()
+
+
+    def _plan(self, rng):
+        """
+        Yields:
+            tuple: Shard index and the row indices of one batch, one
+                group of shards at a time.
+        """
+
+        order = np.arange(len(self.shards))
+
+        if self.shuffle:
+            rng.shuffle(order)
+
+        for group_start in range(0, len(order), self.shard_group):
+            plan = []
+
+            for shard_index in order[group_start:group_start + self.shard_group]:
+                rows = np.arange(len(self.shards[shard_index]['moves']))
+
+                if self.shuffle:
+                    rng.shuffle(rows)
+
+                for start in range(0, len(rows), self.batch_size):
+                    # Sorted rows read the memory map front to back
+                    plan.append((shard_index, np.sort(rows[start:start + self.batch_size])))
+
+            if self.shuffle:
+                plan = [plan[index] for index in rng.permutation(len(plan))]
+
+            yield from plan
+
+
+    def _feed(self, plan, tasks, stop):
+        try:
+            for task in plan:
+                self._put(tasks, task, stop)
+        except Exception as error:
+            self._put(tasks, error, stop)
+
+        # One end marker per worker
+        for _ in range(self.workers):
+            self._put(tasks, None, stop)
+
+
+    def _worker(self, tasks, batches, stop, rng):
+        try:
+            while not stop.is_set():
+                task = self._get(tasks, stop)
+
+                if task is None:
+                    break
+
+                if isinstance(task, BaseException):
+                    raise task
+
+                shard_index, rows = task
+                shard = self.shards[shard_index]
+                batch = shard['planes'][rows], shard['moves'][rows], shard['values'][rows]
+
+                if self.augment:
+                    batch = augment(*batch, rng)
+
+                self._put(batches, batch, stop)
+        except Exception as error:
+            self._put(batches, error, stop)
+
+        self._put(batches, None, stop)
+
+
+    def _put(self, batches, item, stop):
+        # Give up once the consumer has stopped iterating
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+    def _get(self, tasks, stop):
+        while not stop.is_set():
+            try:
+                return tasks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+        return None
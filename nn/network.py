@@ -0,0 +1,149 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from nn.encoding import NUM_MOVES, NUM_PLANES, NUM_SQUARES
+
+NUM_INPUTS = NUM_PLANES * NUM_SQUARES
+
+# Checkpoint layout: magic, header length, JSON header, then the raw
+# little-endian float32 arrays, each aligned for memory-mapping.
+MAGIC = b'CNN1'
+ALIGNMENT = 64
+
+
+class Network:
+    """
+    Small value and policy network over the encoded planes. A shared
+    hidden layer feeds a policy head (one logit per move index) and a
+    value head predicting the game result from white's point of view.
+    """
+
+    def __init__(self, params):
+        self.params = params
+
+
+    @classmethod
+    def initialize(cls, hidden=256, seed=None):
+        """Creates a network with He-initialized weights."""
+
+        rng = np.random.default_rng(seed)
+
+        def weights(inputs, outputs):
+            scale = np.sqrt(2.0 / inputs)
+            return (rng.standard_normal((inputs, outputs)) * scale).astype(np.float32)
+
+        params = {
+            'hidden_weights': weights(NUM_INPUTS, hidden),
+            'hidden_bias': np.zeros(hidden, dtype=np.float32),
+            'policy_weights': weights(hidden, NUM_MOVES),
+            'policy_bias': np.zeros(NUM_MOVES, dtype=np.float32),
+            'value_weights': weights(hidden, 1),
+            'value_bias': np.zeros(1, dtype=np.float32),
+        }
+
+        return cls(params)
+
+
+    @classmethod
+    def load(cls, path):
+        return cls(load_checkpoint(path))
+
+
+    def save(self, path):
+        save_checkpoint(path, self.params)
+
+
+    def forward(self, planes):
+        """
+        Runs the network on a batch of encoded positions.
+
+        Returns:
+        tuple: Input, hidden activations, policy logits and values,
+            everything the backward pass needs.
+        """
+
+        params = self.params
+
+        inputs = np.asarray(planes, dtype=np.float32).reshape(len(planes), NUM_INPUTS)
+        hidden = inputs @ params['hidden_weights'] + params['hidden_bias']
+        np.maximum(hidden, 0, out=hidden)
+
+        logits = hidden @ params['policy_weights'] + params['policy_bias']
+        values = np.tanh(hidden @ params['value_weights'] + params['value_bias'])[:, 0]
+
+        return inputs, hidden, logits, values
+
+
+    def evaluate(self, planes):
+        """
+        Returns:
+        tuple: Move probabilities of shape (N, NUM_MOVES) and values of shape (N,).
+        """
+
+        _, _, logits, values = self.forward(planes)
+
+        return softmax(logits), values
+
+
+def softmax(logits):
+    exponents = np.exp(logits - logits.max(axis=1, keepdims=True))
+
+    return exponents / exponents.sum(axis=1, keepdims=True)
+
+
+def save_checkpoint(path, params):
+    """
+    Writes the parameters in the checkpoint format. The file is written
+    next to the target first, so a reader never sees a partial file.
+    """
+
+    entries, offset = [], 0
+
+    for name, array in params.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        entries.append({'name': name, 'shape': list(array.shape), 'offset': offset})
+        offset += array.size * 4
+
+    header = json.dumps(entries).encode()
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    with open(path + '.tmp', 'wb') as file:
+        file.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+        for entry, array in zip(entries, params.values()):
+            file.seek(data_start + entry['offset'])
+            file.write(np.ascontiguousarray(array, dtype='<f4').tobytes())
+
+    os.replace(path + '.tmp', path)
+
+
+def load_checkpoint(path):
+    """
+    Memory-maps a checkpoint written by save_checkpoint.
+
+    Returns:
+    dict: Read-only float32 arrays by parameter name.
+    """
+
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"Not a network checkpoint: '{path}'.")
+
+    header_length, = struct.unpack('<I', bytes(data[len(MAGIC):len(MAGIC) + 4]))
+    header_end = len(MAGIC) + 4 + header_length
+    data_start = -(-header_end // ALIGNMENT) * ALIGNMENT
+
+    entries = json.loads(bytes(data[len(MAGIC) + 4:header_end]))
+    params = {}
+
+    for entry in entries:
+        start = data_start + entry['offset']
+        size = int(np.prod(entry['shape'])) * 4
+
+        params[entry['name']] = data[start:start + size].view('<f4').reshape(entry['shape'])
+
+    return params
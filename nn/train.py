@@ -0,0 +1,158 @@
+import argparse
+import glob
+import time
+
+import numpy as np
+
+from nn.loader import BatchLoader
+from nn.network import Network, softmax
+
+
+class Trainer:
+    """Adam optimizer for the policy and value losses of a Network."""
+
+    def __init__(self, network, learning_rate=1e-3, value_weight=1.0,
+                 betas=(0.9, 0.999), epsilon=1e-8):
+        self.network = network
+        self.learning_rate = learning_rate
+        self.value_weight = value_weight
+        self.betas = betas
+        self.epsilon = epsilon
+
+        # Loaded checkpoints are read-only memory maps
+        network.params = {name: np.array(array, dtype=np.float32)
+                          for name, array in network.params.items()}
+
+        self._first_moments = {name: np.zeros_like(array) for name, array in network.params.items()}
+        self._second_moments = {name: np.zeros_like(array) for name, array in network.params.items()}
+        self._steps = 0
+
+
+    def step(self, planes, moves, values):
+        """
+        Runs one optimization step on a minibatch.
+
+        Returns:
+        tuple: The policy (cross-entropy) and value (squared error) losses.
+        """
+
+        params = self.network.params
+        size = len(planes)
+        rows = np.arange(size)
+
+        inputs, hidden, logits, predictions = self.network.forward(planes)
+        probabilities = softmax(logits)
+
+        policy_loss = -np.mean(np.log(probabilities[rows, moves] + 1e-12))
+        errors = predictions - values
+        value_loss = np.mean(errors ** 2)
+
+        # Backward pass
+        grad_logits = probabilities
+        grad_logits[rows, moves] -= 1
+        grad_logits /= size
+
+        grad_values = (2 * self.value_weight / size) * errors * (1 - predictions ** 2)
+        grad_values = grad_values[:, None].astype(np.float32)
+
+        grad_hidden = grad_logits @ params['policy_weights'].T + grad_values @ params['value_weights'].T
+        grad_hidden *= hidden > 0
+
+        grads = {
+            'hidden_weights': inputs.T @ grad_hidden,
+            'hidden_bias': grad_hidden.sum(axis=0),
+            'policy_weights': hidden.T @ grad_logits,
+            'policy_bias': grad_logits.sum(axis=0),
+            'value_weights': hidden.T @ grad_values,
+            'value_bias': grad_values.sum(axis=0),
+        }
+
+        self._apply(grads)
+
+        return float(policy_loss), float(value_loss)
+
+
+    def _apply(self, grads):
+        beta1, beta2 = self.betas
+        self._steps += 1
+
+        step_size = self.learning_rate * np.sqrt(1 - beta2 ** self._steps) / (1 - beta1 ** self._steps)
+
+        for name, grad in grads.items():
+            first, second = self._first_moments[name], self._second_moments[name]
+
+            first *= beta1
+            first += (1 - beta1) * grad
+            second *= beta2
+            second += (1 - beta2) * grad * grad
+
+            self.network.params[name] -= step_size * first / (np.sqrt(second) + self.epsilon)
+
+
+def train(shard_paths, output_path, epochs=1, batch_size=256, hidden=256,
+          learning_rate=1e-3, workers=2, resume=None, seed=None, log_every=100):
+    """
+    Trains a network on encoded shards and checkpoints it to
+    output_path after every epoch.
+
+    Returns:
+    Network: The trained network.
+    """
+
+    if resume is not None:
+        network = Network.load(resume)
+    else:
+        network = Network.initialize(hidden, seed)
+
+    trainer = Trainer(network, learning_rate)
+    loader = BatchLoader(shard_paths, batch_size, workers=workers, seed=seed)
+
+    for epoch in range(1, epochs + 1):
+        start = time.perf_counter()
+        samples = 0
+        policy_total = value_total = 0.0
+
+        for step, (planes, moves, values) in enumerate(loader, start=1):
+            policy_loss, value_loss = trainer.step(planes, moves, values)
+
+            samples += len(planes)
+            policy_total += policy_loss
+            value_total += value_loss
+
+            if step % log_every == 0:
+                rate = samples / (time.perf_counter() - start)
+                print(f"epoch {epoch} step {step}/{len(loader)}: "
+                      f"policy loss {policy_total / step:.4f}, "
+                      f"value loss {value_total / step:.4f}, "
+                      f"{rate:.0f} samples/s")
+
+        elapsed = time.perf_counter() - start
+        print(f"epoch {epoch} done: {samples} samples in {elapsed:.1f}s "
+              f"({samples / elapsed:.0f} samples/s)")
+
+        network.save(output_path)
+
+    return network
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the value/policy network on the CPU.")
+    parser.add_argument('shards', nargs='+', help="shard directories or glob patterns")
+    parser.add_argument('--output', required=True, help="checkpoint file to write")
+    parser.add_argument('--resume', default=None, help="checkpoint to continue from")
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--hidden', type=int, default=256)
+    parser.add_argument('--learning-rate', type=float, default=1e-3)
+    parser.add_argument('--workers', type=int, default=2, help="prefetch threads")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    shard_paths = sorted(path for pattern in args.shards for path in glob.glob(pattern))
+
+    train(shard_paths, args.output, args.epochs, args.batch_size, args.hidden,
+          args.learning_rate, args.workers, args.resume, args.seed)
+
+
+if __name__ == '__main__':
+    main()
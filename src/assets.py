@@ -0,0 +1,137 @@
+import hashlib
+import os
+
+import pygame as pg
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'images')
+
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+                         'chess-nn')
+
+PIECES = ['wp', 'wN', 'wB', 'wR', 'wQ', 'wK',
+          'bp', 'bN', 'bB', 'bR', 'bQ', 'bK']
+
+
+class SpriteAtlas:
+    """
+    All pieces scaled to one size and packed side by side into a
+    single surface.
+
+    Atlases are built lazily for every size that is asked for and kept
+    in memory. They are also cached on disk as raw RGBA pixels, keyed
+    by the size and a hash of the source images, so a later launch
+    skips decoding and scaling the PNGs altogether.
+    """
+
+    def __init__(self, image_dir=IMAGE_DIR, cache_dir=CACHE_DIR):
+        self.image_dir = image_dir
+        self.cache_dir = cache_dir
+
+        self._atlases = {}
+        self._sources = None
+        self._digest = None
+
+
+    def surface(self, size):
+        """
+        Returns:
+        tuple: The atlas surface for pieces of size x size pixels, and
+            the rect of every piece within it.
+        """
+
+        size = int(size)
+
+        if size not in self._atlases:
+            atlas = self._load_cached(size)
+
+            if atlas is None:
+                atlas = self._build(size)
+                self._save_cached(size, atlas)
+
+            # Converting speeds up blitting, but needs a display mode
+            if pg.display.get_init() and pg.display.get_surface() is not None:
+                atlas = atlas.convert_alpha()
+
+            rects = {piece: pg.Rect(index * size, 0, size, size)
+                     for index, piece in enumerate(PIECES)}
+
+            self._atlases[size] = atlas, rects
+
+        return self._atlases[size]
+
+
+    def pieces(self, size):
+        """Returns a surface per piece, sharing the pixels of the atlas."""
+
+        atlas, rects = self.surface(size)
+
+        return {piece: atlas.subsurface(rect) for piece, rect in rects.items()}
+
+
+    def digest(self):
+        """Hash of the source images, changing whenever one is replaced."""
+
+        if self._digest is None:
+            sha = hashlib.sha256()
+
+            for piece in PIECES:
+                with open(self._source_path(piece), 'rb') as file:
+                    sha.update(file.read())
+
+            self._digest = sha.hexdigest()[:16]
+
+        return self._digest
+
+
+    def _source_path(self, piece):
+        return os.path.join(self.image_dir, piece + '.png')
+
+
+    def _cache_path(self, size):
+        return os.path.join(self.cache_dir, f'pieces-{size}-{self.digest()}.rgba')
+
+
+    def _build(self, size):
+        # Sources are decoded once and reused for every other size
+        if self._sources is None:
+            self._sources = {piece: pg.image.load(self._source_path(piece))
+                             for piece in PIECES}
+
+        atlas = pg.Surface((size * len(PIECES), size), pg.SRCALPHA)
+
+        for index, piece in enumerate(PIECES):
+            image = pg.transform.smoothscale(self._sources[piece], (size, size))
+            atlas.blit(image, (index * size, 0))
+
+        return atlas
+
+
+    def _load_cached(self, size):
+        try:
+            with open(self._cache_path(size), 'rb') as file:
+                pixels = file.read()
+        except OSError:
+            return None
+
+        dimensions = (size * len(PIECES), size)
+
+        # Truncated or stale file
+        if len(pixels) != dimensions[0] * dimensions[1] * 4:
+            return None
+
+        return pg.image.frombytes(pixels, dimensions, 'RGBA')
+
+
+    def _save_cached(self, size, atlas):
+        path = self._cache_path(size)
+
+        # The cache is an optimization only, e.g. the disk may be read-only
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            with open(path + '.tmp', 'wb') as file:
+                file.write(pg.image.tobytes(atlas, 'RGBA'))
+
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass
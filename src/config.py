@@ -9,4 +9,6 @@ BOUNDS = BOARD_SIZE - 1
 
 MAX_FPS = 60
 
+RESIZE_STEP = 8 # Tile sizes snap to multiples of this when resizing
+
 EMPTY = '--' # Empty piece
@@ -1,29 +1,31 @@
 import pygame as pg
 from config import *
 
+from src.assets import SpriteAtlas
+
 IMAGES = {}
 
-def draw_rect(row, col):
-    rect = pg.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+ATLAS = SpriteAtlas()
+
+def draw_rect(row, col, tile_size=TILE_SIZE):
+    rect = pg.Rect(col * tile_size, row * tile_size, tile_size, tile_size)
 
     return rect
 
 
-def load_pieces():
+def load_pieces(tile_size=TILE_SIZE):
     """
-    Load chess pieces. This will only be done once, at the start of the
-    game's execution.
+    Load chess pieces scaled for the given tile size. Each size is
+    only scaled once; switching back to a size reuses the cached atlas.
     """
 
-    pieces = ['bR', 'bN', 'bB', 'bK', 'bQ', 'bB', 'bN', 'bR', 'bp',
-              'wR', 'wN', 'wB', 'wK', 'wQ', 'wB', 'wN', 'wR', 'wp']
+    piece_size = int(tile_size * PIECE_SIZE / TILE_SIZE)
 
-    for piece in pieces:
-        image = pg.image.load("../images/" + piece + ".png")
-        IMAGES[piece] = pg.transform.smoothscale(image, size=(PIECE_SIZE, PIECE_SIZE))
+    IMAGES.clear()
+    IMAGES.update(ATLAS.pieces(piece_size))
 
 
-def load_grid(screen):
+def load_grid(screen, tile_size=TILE_SIZE):
     """
     Responsible for generating and updating GUI graphics
     for each chessboard game state.
@@ -42,11 +44,11 @@ def load_grid(screen):
             else:
                 color = colors[1]
 
-            rect = draw_rect(row, col)
+            rect = draw_rect(row, col, tile_size)
             pg.draw.rect(screen, color, rect)
 
 
-def update_pieces(screen, board):
+def update_pieces(screen, board, tile_size=TILE_SIZE):
     """
     Responsible for generating and updating GUI graphics
     for each chessboard game state.
@@ -62,14 +64,14 @@ def update_pieces(screen, board):
             piece_image = IMAGES[piece]
             piece_rect = piece_image.get_rect()
 
-            offset = 5
-            piece_rect.center = (col * TILE_SIZE + TILE_SIZE // 2,
-                                 row * TILE_SIZE + TILE_SIZE // 2 + offset)
+            offset = round(5 * tile_size / TILE_SIZE)
+            piece_rect.center = (col * tile_size + tile_size // 2,
+                                 row * tile_size + tile_size // 2 + offset)
 
             screen.blit(piece_image, piece_rect.topleft)
 
 
-def highlight_valid_moves(screen, valid_moves):
+def highlight_valid_moves(screen, valid_moves, tile_size=TILE_SIZE):
     """
     This function is responsible for the visualization
     of the move space for the clicked piece. If a
@@ -80,40 +82,40 @@ def highlight_valid_moves(screen, valid_moves):
     for pos in valid_moves:
         row, col = pos
 
-        surface = pg.Surface((TILE_SIZE, TILE_SIZE), pg.SRCALPHA)
+        surface = pg.Surface((tile_size, tile_size), pg.SRCALPHA)
 
         # Circles must be centered within the tile
-        center = (TILE_SIZE // 2, TILE_SIZE // 2)
-        radius = TILE_SIZE // 6
+        center = (tile_size // 2, tile_size // 2)
+        radius = tile_size // 6
 
         alpha = 120
         black = (51, 55, 76, alpha)
 
         pg.draw.circle(surface, black, center, radius)
 
-        screen.blit(surface, (col * TILE_SIZE, row * TILE_SIZE))
+        screen.blit(surface, (col * tile_size, row * tile_size))
 
 
 
-def _highlight_tile(screen, tile):
+def _highlight_tile(screen, tile, tile_size=TILE_SIZE):
     if None in tile:
         return
 
     row, col = tile
 
-    surface = pg.Surface((TILE_SIZE, TILE_SIZE))
+    surface = pg.Surface((tile_size, tile_size))
     surface.set_alpha(150)
 
     rouge = pg.Color('#7d3d54')
     surface.fill(rouge)
 
-    screen.blit(surface, (col*TILE_SIZE, row*TILE_SIZE))
+    screen.blit(surface, (col*tile_size, row*tile_size))
 
 
-def graphics(screen, board, highlighted):
-    load_grid(screen)
+def graphics(screen, board, highlighted, tile_size=TILE_SIZE):
+    load_grid(screen, tile_size)
 
     for tile in highlighted:
-        _highlight_tile(screen, tile)
+        _highlight_tile(screen, tile, tile_size)
 
-    update_pieces(screen, board)
+    update_pieces(screen, board, tile_size)
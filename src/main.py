@@ -1,8 +1,12 @@
+import argparse
+
 import pygame as pg
 
 from chess.engine import Engine, Move, gen_valid_moves
+from chess.opponent import EngineOpponent
+from chess.search import Position, make_move
 from chess.utils import piece_name
-from src.graphics import draw_rect, load_pieces, load_grid, highlight_valid_moves, graphics; load_pieces()
+from src.graphics import draw_rect, load_pieces, load_grid, highlight_valid_moves, graphics
 
 from src.config import *
 from src.graphics import IMAGES
@@ -11,10 +15,11 @@ from src.graphics import IMAGES
 class Chess:
     """Chess interface facilitated by Pygame."""
 
-    def __init__(self):
+    def __init__(self, engine_color=None, engine_depth=3, engine_processes=None):
         pg.init()
 
-        self.screen = pg.display.set_mode((WIDTH, HEIGHT))
+        self.screen = pg.display.set_mode((WIDTH, HEIGHT), pg.RESIZABLE)
+        self.tile_size = TILE_SIZE
 
         pg.display.set_caption("CHESS-NN")
         self.clock = pg.time.Clock()
@@ -30,11 +35,22 @@ class Chess:
         self.source_pos = None
         self.target_pos = None
 
-        load_grid(self.screen)
+        load_pieces(self.tile_size)
+        load_grid(self.screen, self.tile_size)
 
         self.icon = IMAGES['bK']
         pg.display.set_icon(self.icon)
 
+        # Engine opponent playing 'w' or 'b', if any
+        self.engine_color = engine_color
+        self.opponent = None
+
+        if engine_color is not None:
+            self.opponent = EngineOpponent(max_depth=engine_depth, processes=engine_processes)
+
+            if self.is_engine_turn():
+                self.opponent.think(self.position())
+
         self.running = True
 
 
@@ -48,6 +64,9 @@ class Chess:
                 if event.type == pg.QUIT:
                     self.running = False
 
+                if event.type == pg.VIDEORESIZE:
+                    self.resize_handler(event.w, event.h)
+
                 if event.type == pg.MOUSEBUTTONDOWN:
                     self.marked_moves_handler(event, row, col)
 
@@ -62,30 +81,91 @@ class Chess:
                 if event.type == pg.MOUSEBUTTONUP:
                     self.valid_moves.clear()
 
-                    if self.target_pos:
+                    if self.target_pos and not self.is_engine_turn():
                         self.move_handler(self.source_pos, self.target_pos)
 
                     self.source_pos = None
                     self.target_pos = None
 
-            graphics(self.screen, self.engine.board, self.marked_moves)
-            highlight_valid_moves(self.screen, self.valid_moves)
+            self.opponent_handler()
+
+            graphics(self.screen, self.engine.board, self.marked_moves, self.tile_size)
+            highlight_valid_moves(self.screen, self.valid_moves, self.tile_size)
 
             self.target_pos = self.drag(self.source_piece, self.source_pos)
 
             self.clock.tick(MAX_FPS)
             pg.display.flip()
 
+        if self.opponent is not None:
+            self.opponent.close()
+
         pg.quit()
 
 
+    def position(self):
+        """Snapshot of the current game state for the engine search."""
+
+        board = [row[:] for row in self.engine.board]
+
+        return Position(board, self.engine.history[-1:], self.white_to_move,
+                        dict(self.move.castling_rights))
+
+
+    def is_engine_turn(self):
+        if self.engine_color is None:
+            return False
+
+        return self.white_to_move == (self.engine_color == 'w')
+
+
+    def opponent_handler(self):
+        """
+        Plays the engine's move once its search has finished, then
+        ponders on the predicted reply while the player is thinking.
+        """
+
+        if self.opponent is None:
+            return
+
+        result = self.opponent.poll()
+
+        if result is None or result.move is None:
+            return
+
+        source, target, _ = result.move
+        self.move_handler(source, target)
+
+        if len(result.pv) > 1:
+            predicted_reply = result.pv[1]
+            self.opponent.ponder(make_move(self.position(), predicted_reply))
+
+
+    def resize_handler(self, width, height):
+        """
+        Fits the board to the resized window. Tile sizes are rounded
+        down to a multiple of RESIZE_STEP, so that resizing the window
+        reuses a small number of cached piece scales.
+        """
+
+        tile_size = min(width, height) // BOARD_SIZE
+        tile_size = max(RESIZE_STEP, tile_size // RESIZE_STEP * RESIZE_STEP)
+
+        self.screen = pg.display.get_surface()
+        self.screen.fill('#000000')
+
+        if tile_size != self.tile_size:
+            self.tile_size = tile_size
+            load_pieces(tile_size)
+
+
     def get_tile_under_mouse(self):
         """Obtains the tile belonging to the mouse position."""
 
         x_mouse, y_mouse = pg.mouse.get_pos()
 
-        row = y_mouse // TILE_SIZE
-        col = x_mouse // TILE_SIZE
+        row = y_mouse // self.tile_size
+        col = x_mouse // self.tile_size
 
         try:
             if row >= 0 and col >= 0:
@@ -155,7 +235,7 @@ class Chess:
 
         row, col = loc
 
-        rect = draw_rect(row, col)
+        rect = draw_rect(row, col, self.tile_size)
         pg.draw.rect(self.screen, '#cda7e7', rect, 5)
 
         image = IMAGES[piece]
@@ -166,8 +246,8 @@ class Chess:
         self.screen.blit(image, image.get_rect(center = pg.Vector2(pos) + offset))
         self.screen.blit(image, image.get_rect(center = pg.Vector2(pos)))
 
-        end_row = pos[1] // TILE_SIZE
-        end_col = pos[0] // TILE_SIZE
+        end_row = pos[1] // self.tile_size
+        end_col = pos[0] // self.tile_size
 
         return end_row, end_col
 
@@ -188,7 +268,21 @@ class Chess:
 
         self.engine.perform_move(source, target, special_move=move_type)
 
+        # Supersedes any pondering on the predicted reply
+        if self.is_engine_turn():
+            self.opponent.think(self.position())
+
 
 if __name__ == '__main__':
-    main = Chess()
+    parser = argparse.ArgumentParser(description="Play chess with Pygame.")
+    parser.add_argument('--engine', choices=['w', 'b'], default=None,
+                        help="let the engine play this color")
+    parser.add_argument('--depth', type=int, default=3,
+                        help="search depth of the engine")
+    parser.add_argument('--processes', type=int, default=None,
+                        help="search processes of the engine, all cores but one by default")
+    args = parser.parse_args()
+
+    main = Chess(engine_color=args.engine, engine_depth=args.depth,
+                 engine_processes=args.processes)
     main.run()
\ No newline at end of file
@@ -0,0 +1,244 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+
+# Render without a window; must be set before pygame is initialized
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+# SDL turns SIGTERM into a quit event, which would keep the pool
+# from terminating its workers
+os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import pygame as pg
+
+from chess.search import find_move, make_move, start_position
+from src.assets import SpriteAtlas
+from src.config import BOARD_SIZE, EMPTY, TILE_SIZE
+
+# Same colors as the live board in graphics.py
+LIGHT, DARK = '#f1f1f1', '#8475b9'
+HIGHLIGHT = '#7d3d54'
+
+
+class Renderer:
+    """
+    Offscreen board renderer. The checkerboard and the scaled pieces
+    are drawn once, and every position is composed into the same
+    reusable frame surface from those caches.
+    """
+
+    def __init__(self, tile_size=32, piece_scale=0.9, atlas=None):
+        pg.display.init()
+
+        # convert_alpha needs a display mode, even a dummy one
+        if pg.display.get_surface() is None:
+            pg.display.set_mode((1, 1))
+
+        self.tile_size = tile_size
+        self.piece_size = int(tile_size * piece_scale)
+        self.size = tile_size * BOARD_SIZE
+
+        # graphics.py nudges pieces 5 pixels down on its 108 pixel tiles
+        self.piece_offset = round(5 * tile_size / TILE_SIZE)
+
+        self.checkerboard = self._draw_checkerboard()
+        self.atlas, self.atlas_rects = (atlas or SpriteAtlas()).surface(self.piece_size)
+
+        self.highlight = pg.Surface((tile_size, tile_size))
+        self.highlight.set_alpha(150)
+        self.highlight.fill(pg.Color(HIGHLIGHT))
+
+        self.frame = pg.Surface((self.size, self.size)).convert()
+
+
+    def render(self, board, highlighted=()):
+        """
+        Draws a board into the frame surface.
+
+        Parameters:
+        board (list): The chess board to draw.
+        highlighted (iterable): Tiles (row, col) to highlight, e.g. the last move.
+
+        Returns:
+        pg.Surface: The frame. It is reused by the next call.
+        """
+
+        tile = self.tile_size
+        self.frame.blit(self.checkerboard, (0, 0))
+
+        for row, col in highlighted:
+            self.frame.blit(self.highlight, (col * tile, row * tile))
+
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = board[row][col]
+
+                if piece == EMPTY:
+                    continue
+
+                area = self.atlas_rects[piece]
+                x = col * tile + (tile - area.width) // 2
+                y = row * tile + (tile - area.height) // 2 + self.piece_offset
+
+                self.frame.blit(self.atlas, (x, y), area)
+
+        return self.frame
+
+
+    def to_array(self):
+        """Copies the frame into a uint8 array of shape (height, width, 3)."""
+
+        return pg.surfarray.array3d(self.frame).swapaxes(0, 1)
+
+
+    def save(self, path):
+        """Saves the frame as an image; the format follows the extension."""
+
+        pg.image.save(self.frame, path)
+
+
+    def _draw_checkerboard(self):
+        surface = pg.Surface((self.size, self.size))
+        colors = [pg.Color(LIGHT), pg.Color(DARK)]
+
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                rect = pg.Rect(col * self.tile_size, row * self.tile_size,
+                               self.tile_size, self.tile_size)
+                pg.draw.rect(surface, colors[(row + col) % 2], rect)
+
+        return surface.convert()
+
+
+def replay(moves):
+    """
+    Plays a game from the initial position.
+
+    Parameters:
+    moves (list): Moves as ((source_row, source_col), (target_row, target_col)).
+
+    Yields:
+        Position: The position before the first move and after every move.
+        tuple: The squares of the move leading to it, or () at the start.
+    """
+
+    position = start_position()
+    yield position, ()
+
+    for source_pos, target_pos in moves:
+        source_pos, target_pos = tuple(source_pos), tuple(target_pos)
+        move = find_move(position, source_pos, target_pos)
+
+        if move is None:
+            raise ValueError(f"Invalid move in game: {source_pos} -> {target_pos}.")
+
+        position = make_move(position, move)
+        yield position, (source_pos, target_pos)
+
+
+_renderer = None
+
+
+def _init_worker(tile_size):
+    global _renderer
+    _renderer = Renderer(tile_size)
+
+
+def _render_game(task):
+    """Renders one game in a worker process and returns its frame count."""
+
+    game_index, moves, output_dir, output_format, thumbnail = task
+
+    frames = list(replay(moves))
+    if thumbnail:
+        frames = frames[-1:]
+
+    name = f'game-{game_index:06d}'
+
+    if output_format == 'npy':
+        arrays = np.empty((len(frames), _renderer.size, _renderer.size, 3), dtype=np.uint8)
+
+        for index, (position, last_move) in enumerate(frames):
+            _renderer.render(position.board, last_move)
+            arrays[index] = _renderer.to_array()
+
+        np.save(os.path.join(output_dir, name + '.npy'), arrays)
+
+    elif thumbnail:
+        position, last_move = frames[0]
+        _renderer.render(position.board, last_move)
+        _renderer.save(os.path.join(output_dir, name + '.png'))
+
+    else:
+        game_dir = os.path.join(output_dir, name)
+        os.makedirs(game_dir, exist_ok=True)
+
+        for index, (position, last_move) in enumerate(frames):
+            _renderer.render(position.board, last_move)
+            _renderer.save(os.path.join(game_dir, f'frame-{index:04d}.png'))
+
+    return len(frames)
+
+
+def render_games(games, output_dir, processes=None, tile_size=32,
+                 output_format='png', thumbnail=False):
+    """
+    Renders many games in a pool of worker processes, each with its
+    own renderer.
+
+    Parameters:
+    games (iterable): Games as lists of moves, see replay.
+    output_dir (str): Directory for the frames.
+    processes (int): Number of workers, all cores by default.
+    tile_size (int): Size of a board tile in pixels.
+    output_format (str): 'png' for image files, 'npy' for one array per game.
+    thumbnail (bool): Only render the final position of each game.
+
+    Returns:
+    tuple: Frames rendered, and frames per second per core.
+    """
+
+    processes = processes or os.cpu_count()
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = ((index, moves, output_dir, output_format, thumbnail)
+             for index, moves in enumerate(games))
+
+    start = time.perf_counter()
+
+    with mp.Pool(processes, initializer=_init_worker, initargs=(tile_size,)) as pool:
+        frames = sum(pool.imap_unordered(_render_game, tasks, chunksize=4))
+
+    elapsed = time.perf_counter() - start
+
+    return frames, frames / elapsed / processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render games to images without a display.")
+    parser.add_argument('games', help="JSONL file, one game per line as a list of "
+                                      "[[source_row, source_col], [target_row, target_col]] moves")
+    parser.add_argument('--output', required=True, help="output directory")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--tile-size', type=int, default=32)
+    parser.add_argument('--format', choices=['png', 'npy'], default='png')
+    parser.add_argument('--thumbnail', action='store_true',
+                        help="only render the final position of each game")
+    args = parser.parse_args()
+
+    with open(args.games) as file:
+        games = [json.loads(line) for line in file if line.strip()]
+
+    frames, per_core = render_games(games, args.output, args.processes, args.tile_size,
+                                    args.format, args.thumbnail)
+
+    print(f"{frames} frames from {len(games)} games, {per_core:.0f} frames/s per core")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import numpy as np
+
+from nn.dedup import DedupIndex, _load
+
+
+def test_levelled_merge_counts_every_key(tmp_path):
+    rng = np.random.default_rng(0)
+    index = DedupIndex(str(tmp_path), capacity=10_000, buffer_size=100, max_runs=2)
+    expected = {}
+
+    for batch in range(30):
+        keys = rng.integers(0, 3000, 150, dtype=np.uint64)
+        sources = np.arange(150, dtype=np.uint64) + batch * 150
+
+        index.add(keys, sources, rng.integers(-1, 2, 150))
+
+        for key in keys.tolist():
+            expected[key] = expected.get(key, 0) + 1
+
+    index.merge()
+    records = _load(index.index_path)
+
+    assert records['key'].tolist() == sorted(expected)
+    assert records['count'].tolist() == [expected[key] for key in sorted(expected)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['index.bin', 'keys.bin']
+
+
+def test_keys_equal_to_the_first_are_aggregated(tmp_path):
+    index = DedupIndex(str(tmp_path), capacity=100)
+    keys = np.array([0, 0, 5, 5, 5], dtype=np.uint64)
+
+    index.add(keys, np.arange(5, dtype=np.uint64), np.zeros(5))
+    index.merge()
+
+    assert _load(index.index_path)['count'].tolist() == [2, 3]
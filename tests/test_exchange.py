@@ -0,0 +1,64 @@
+from chess.exchange import hanging_pieces, see
+from chess.search import Position
+
+
+def make_position(rows, white_to_move=True):
+    board = [row.split() for row in rows]
+    castling_rights = {'w_kingside': False, 'w_queenside': False,
+                       'b_kingside': False, 'b_queenside': False}
+
+    return Position(board, [((None, None), (None, None), board)], white_to_move, castling_rights)
+
+
+def test_capture_defended_by_pawn():
+    position = make_position(["-- -- -- -- bK -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- bp -- -- -- --",
+                              "-- -- bp -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- wR -- wK -- -- --"])
+
+    assert see(position, ((7, 2), (3, 2), "normal")) == 100 - 500
+
+
+def test_xray_behind_capturing_rook():
+    position = make_position(["-- -- bR -- bK -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- bp -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- wR -- -- -- -- --",
+                              "-- -- wR -- wK -- -- --"])
+
+    assert see(position, ((6, 2), (3, 2), "normal")) == 100
+
+
+def test_slider_behind_moving_piece_counted_once():
+    # RxN, RxR, QxR, QxQ: the white queen behind the rook recaptures only once
+    position = make_position(["bN bR -- -- bK -- -- --",
+                              "-- bQ -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "wR -- -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "wQ -- -- -- wK -- -- --"])
+
+    assert see(position, ((4, 0), (0, 0), "normal")) == 320 - 500
+
+
+def test_hanging_pieces():
+    position = make_position(["-- -- -- -- bK -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- bp -- -- --",
+                              "-- -- -- wN -- -- -- --",
+                              "-- -- wB -- -- -- -- --",
+                              "-- -- -- -- -- -- -- --",
+                              "-- -- -- -- wK -- -- --"])
+
+    assert hanging_pieces(position, 'w') == [(4, 3)]
+    assert hanging_pieces(position, 'b') == []
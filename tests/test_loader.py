@@ -0,0 +1,27 @@
+import numpy as np
+
+from nn.encoding import NUM_PLANES, write_shard
+from nn.loader import BatchLoader
+
+
+def test_epoch_covers_every_row_once(tmp_path):
+    paths = []
+
+    for index in range(5):
+        rows = 100 + 10 * index
+        moves = np.arange(rows) + 1000 * index
+        planes = np.zeros((rows, NUM_PLANES, 8, 8), dtype=np.uint8)
+
+        paths.append(str(tmp_path / f'shard-{index}'))
+        write_shard(paths[-1], planes, moves, np.zeros(rows, dtype=np.float32))
+
+    loader = BatchLoader(paths, batch_size=32, augment=False, workers=3, seed=0, shard_group=2)
+
+    for _ in range(2):
+        seen = np.concatenate([moves for _, moves, _ in loader])
+        assert sorted(seen.tolist()) == [1000 * index + row
+                                         for index in range(5) for row in range(100 + 10 * index)]
+
+    for count, _ in enumerate(loader):
+        if count == 2:
+            break
@@ -0,0 +1,41 @@
+from chess.engine import gen_all_moves
+from chess.notation import parse_fen
+from chess.search import Search
+
+
+def test_root_split_finds_the_same_score():
+    position = parse_fen('6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1')
+    expected = Search().search(position, 2)
+
+    moves = list(gen_all_moves(position.board, position.history,
+                               position.white_to_move, position.castling_rights))
+    shares = [Search().search(position, 2, root_moves=moves[index::3]) for index in range(3)]
+
+    assert all(result.move in moves[index::3] for index, result in enumerate(shares))
+    assert max(result.score for result in shares) == expected.score
+
+
+def test_root_split_forgets_the_previous_position():
+    search = Search()
+
+    position = parse_fen('6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1')
+    moves = list(gen_all_moves(position.board, position.history,
+                               position.white_to_move, position.castling_rights))
+    assert search.search(position, 2, root_moves=moves).move is not None
+
+    # The king of the side to move has been captured
+    position = parse_fen('6k1/5ppp/8/8/8/8/5PPP/R7 w - - 0 1')
+    moves = list(gen_all_moves(position.board, position.history,
+                               position.white_to_move, position.castling_rights))
+    result = search.search(position, 2, root_moves=moves)
+
+    assert result.move is None
+    assert result.pv == []
+
+
+def test_time_limit_stops_after_the_first_iteration():
+    position = parse_fen('6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1')
+    result = Search().search(position, 64, time_limit=0)
+
+    assert result.depth == 1
+    assert result.move is not None